@@ -5,6 +5,15 @@ from arcade_tools.GameElement import GameElement
 
 _BACKGROUND_IMAGE_FILE = "./images/space.png"
 
+#
+# The scaled background images already made during this run of the game,
+# keyed by the (width, height) of the screen they were scaled for. This lets
+# any later Background for the same screen size reuse the same surface and
+# skip converting and scaling the image again. The image file itself is still
+# loaded each time, by GameElement.
+#
+_scaled_cache: dict[tuple[int, int], pygame.Surface] = {}
+
 
 class Background(GameElement):
     """
@@ -35,19 +44,36 @@ class Background(GameElement):
         #
         super().__init__(_BACKGROUND_IMAGE_FILE, collidable=False)
 
+        #
+        # If a Background has already been made for this screen size during
+        # this run, share its image. This only saves the convert and scale
+        # below. GameElement has already loaded the image file above, and
+        # avoiding that would need GameElement to accept an already loaded
+        # surface.
+        #
+        screen_size = screen.get_size()
+        if screen_size in _scaled_cache:
+            self.image = _scaled_cache[screen_size]
+            return
+
+        #
+        # Match the pixel format of the screen before scaling, so that the
+        # scaling works on the same 32-bit pixels the screen uses and so that
+        # drawing the background each frame is a straight copy. The scaled
+        # surface keeps this format. The background is opaque, so no alpha
+        # channel is kept.
+        #
+        self.image = self.image.convert(screen)
+
         #
         # Scale the background image to match the size of the screen.
-        try:
-            self.image = pygame.transform.smoothscale(self.image, screen.get_size())
-        except ValueError:
-            """
-            pygame.transform.smoothscale can throw a ValueError for a number
-            of reasons including if the original surface is not a 24-bit or
-            32-bit surface. On the off-chance this is the issue, try using
-            pygame.transform.scale() instead of pygame.transform.smoothscale()
-            if the latter just failed.
-            """
-            self.image = pygame.transform.scale(self.image, screen.get_size())
+        #
+        # The background is a static star field, so the filtering done by
+        # pygame.transform.smoothscale() is not visible and the much cheaper
+        # pygame.transform.scale() is used instead.
+        #
+        self.image = pygame.transform.scale(self.image, screen_size)
+        _scaled_cache[screen_size] = self.image
 
     @typing.override
     def update(self, *args, **kwargs):
@@ -65,7 +91,23 @@ class Background(GameElement):
         """
         pass
 
-    #
-    # GameElement's draw() method is sufficient for the Background, so it
-    # is used as is.
-    #
+    @typing.override
+    def draw(self, screen: pygame.Surface, dirty_rects: list[pygame.Rect] = None):
+        """
+        Draw the background onto the screen.
+
+        Since the background never changes, once it has been drawn in full,
+        only the areas of the screen that other elements were drawn over need
+        to be restored on later frames.
+
+        :param screen: The screen to draw the background on.
+        :param dirty_rects: The areas of the screen, in screen coordinates,
+                            to restore the background over. If this is None,
+                            the whole background is drawn.
+        """
+        if dirty_rects is None:
+            super().draw(screen)
+            return
+
+        for dirty_rect in dirty_rects:
+            screen.blit(self.image, dirty_rect, dirty_rect.move(-self.rect.x, -self.rect.y))
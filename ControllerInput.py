@@ -1,7 +1,64 @@
+import array
+import collections
+import dataclasses
 import pygame
+from pygame._sdl2 import controller as sdl_controller
 
 from controller_config import _button_mapping
 
+#
+# Settings for the text drawn by show_current_state().
+#
+_STATE_FONT_SIZE = 24
+_STATE_TEXT_COLOR = (255, 255, 255)
+
+# The most rendered lines of text that show_current_state() keeps around.
+_STATE_TEXT_CACHE_SIZE = 256
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _ThrustMap:
+    """
+    The "thrust" entry from a joystick's entry in _button_mapping, flattened
+    out of the nested dictionaries so that it can be read with attribute
+    access while the game runs. This is intended to be used internally only.
+    """
+    # The index of the joystick axis that controls the thrust
+    axis: int
+
+    # Multiplied by the axis value so that positive thrust is forward
+    invert: int
+
+
+#
+# The entries that every controller in _button_mapping must have, given as the
+# name of each capability the game uses along with the fields that capability's
+# entry needs. This is intended to be used internally only.
+#
+_REQUIRED_MAPPING_ENTRIES = {
+    "thrust": ("axis", "invert"),
+}
+
+#
+# For devices that SDL recognizes as game controllers, the thrust is read from
+# the y-axis of the left stick. SDL reports stick axes as integers in the range
+# [-32768, 32767] with negative values meaning "up", so the reading is scaled
+# by this factor to get a thrust in the range of about [-1.0, 1.0] that is
+# positive when the stick is pushed forward.
+#
+_GAME_CONTROLLER_THRUST_AXIS = pygame.CONTROLLER_AXIS_LEFTY
+_GAME_CONTROLLER_THRUST_SCALE = -1.0 / 32767
+
+#
+# The state of the player's controls for one frame, as returned by
+# ControllerInput.sample(). Each field holds what the ControllerInput method of
+# the same name returned when the sample was taken.
+#
+ControllerSnapshot = collections.namedtuple("ControllerSnapshot", "thrust")
+
+# The keyboard keys that the game uses, and so are tracked by handle_event().
+_TRACKED_KEYS = frozenset((pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_SPACE))
+
 
 class ControllerInput:
     """
@@ -13,7 +70,9 @@ class ControllerInput:
     being used.
 
     This class is a singleton so that it can be accessed from multiple locations
-    without having to pass the single instance around everywhere.
+    without having to pass the single instance around everywhere. The
+    get_controller() function in this module is the preferred way to get the
+    instance, since it skips the singleton checks once the instance exists.
 
     This class is specific for the space-rocks game.
     """
@@ -41,28 +100,50 @@ class ControllerInput:
                 )
 
             #
-            # Now initialize the _joysticks list.
+            # The tracked keyboard keys that are currently held down, as kept
+            # up to date by handle_event().
+            #
+            self._held_keys = set()
+
+            #
+            # Now initialize the _game_controllers and _joysticks lists.
             #
+            # Any device that SDL has a game controller mapping for is opened
+            # with SDL's game controller API, which gives it a standard layout
+            # of axes and buttons, and goes in the _game_controllers list.
+            # Everything else is opened as a plain joystick, goes in the
+            # _joysticks list, and relies on an entry in controller_config.py
+            # to know which axis does what.
+            #
+            sdl_controller.init()
+            self._game_controllers = []
             self._joysticks = []
+            self._thrust_maps = []
             num_joysticks = pygame.joystick.get_count()
-            if pygame.joystick.get_count() > 0:
+            if num_joysticks > 0:
                 print(f"Found {num_joysticks} joystick{'s' if num_joysticks > 1 else ''}")
                 for joystick_id in range(num_joysticks):
                     joystick = pygame.joystick.Joystick(joystick_id)
-                    self._joysticks.append(joystick)
+                    guid = joystick.get_guid()
                     print(f"  Joystick {joystick_id}")
                     print(f"    Name: {joystick.get_name()}")
-                    print(f"    GUID: {joystick.get_guid()}")
+                    print(f"    GUID: {guid}")
                     print(f"    Number of axis: {joystick.get_numaxes()}")
                     print(f"    Number of buttons: {joystick.get_numbuttons()}")
                     print(f"    Number of hats: {joystick.get_numhats()}")
                     print(f"    Number of balls: {joystick.get_numballs()}")
 
+                    if sdl_controller.is_controller(joystick_id):
+                        print(f"    Using SDL game controller mapping")
+                        self._game_controllers.append(sdl_controller.Controller(joystick_id))
+                        continue
+
+                    self._joysticks.append(joystick)
+
                     #
                     # Check the validity of the config here so that later code
                     # does not have to constantly do it.
                     #
-                    guid = joystick.get_guid()
                     known_guid = False
                     if guid in _button_mapping:
                         known_guid = True
@@ -82,21 +163,100 @@ class ControllerInput:
                     else:
                         error_message += f'The joystick with the GUID "{guid}" does not have an entry in controller_config.py file and the entry for the "default" GUID'
 
-                    if "thrust" not in button_mapping:
-                        error_message += ' does not have an "thrust" entry in it.'
-                        raise RuntimeError(error_message)
+                    for capability, required_fields in _REQUIRED_MAPPING_ENTRIES.items():
+                        if capability not in button_mapping:
+                            error_message += f' does not have an "{capability}" entry in it.'
+                            raise RuntimeError(error_message)
 
-                    if "axis" not in button_mapping["thrust"]:
-                        error_message += ' does not have an "axis" entry in its "thrust" entry.'
-                        raise RuntimeError(error_message)
+                        for required_field in required_fields:
+                            if required_field not in button_mapping[capability]:
+                                error_message += f' does not have an "{required_field}" entry in its "{capability}" entry.'
+                                raise RuntimeError(error_message)
 
-                    if "invert" not in button_mapping["thrust"]:
-                        error_message += ' does not have an "invert" entry in its "thrust" entry.'
-                        raise RuntimeError(error_message)
+                    #
+                    # The GUID of a joystick does not change once it has been
+                    # enumerated, so the values needed from the mapping found
+                    # above are pulled out once here into a _ThrustMap and
+                    # kept in a list that parallels self._joysticks. This keeps
+                    # the per-frame code free of GUID and dictionary lookups.
+                    #
+                    self._thrust_maps.append(_ThrustMap(
+                        axis=button_mapping["thrust"]["axis"],
+                        invert=button_mapping["thrust"]["invert"]
+                    ))
 
+            #
+            # The thrust read from each device by the last call to poll(),
+            # already scaled and inverted as needed. The joysticks come first,
+            # in the same order as self._joysticks, followed by the game
+            # controllers, in the same order as self._game_controllers.
+            #
+            self._thrust_snapshot = array.array('f', [0.0] * (len(self._joysticks) + len(self._game_controllers)))
+
+            #
+            # The font used by show_current_state(), created the first time it
+            # is needed, and the surfaces it has rendered so far, keyed by the
+            # text on them and kept in least recently used order. Most of the
+            # lines shown do not change between frames, so this saves
+            # rendering them again.
+            #
+            self._font = None
+            self._text_cache = collections.OrderedDict()
 
             self._is_initialized = True
 
+    def poll(self):
+        """
+        Read the current state of every joystick and game controller axis
+        that is used by the game and save it for the query methods, such as
+        thrust(), to use.
+
+        This is expected to be called once per frame from the main game loop,
+        after the pygame events for the frame have been retrieved. This way
+        each joystick is only asked for its state once per frame, no matter
+        how many times the query methods are called.
+        """
+        for index, (joystick, thrust_map) in enumerate(zip(self._joysticks, self._thrust_maps)):
+            self._thrust_snapshot[index] = joystick.get_axis(thrust_map.axis) * thrust_map.invert
+
+        for index, game_controller in enumerate(self._game_controllers, start=len(self._joysticks)):
+            self._thrust_snapshot[index] = game_controller.get_axis(_GAME_CONTROLLER_THRUST_AXIS) * _GAME_CONTROLLER_THRUST_SCALE
+
+    def sample(self) -> ControllerSnapshot:
+        """
+        Poll the devices and return the state of the player's controls for
+        this frame.
+
+        This is expected to be called once per frame from the main game loop,
+        after the pygame events for the frame have been handled, with the
+        result passed to each game element's update() method. That way the
+        controls are only read once per frame, no matter how many elements
+        use them.
+
+        :return: ControllerSnapshot - The state of the controls.
+        """
+        self.poll()
+        return ControllerSnapshot(thrust=self.thrust())
+
+    def handle_event(self, event: pygame.event.Event):
+        """
+        Keep track of which of the keyboard keys used by the game are being
+        held down.
+
+        This is expected to be called from the main game loop for every event
+        retrieved from pygame. Following the key presses this way means the
+        query methods, such as thrust(), do not have to ask SDL for the state
+        of the whole keyboard.
+
+        :param event: A pygame event. Only KEYDOWN and KEYUP events for the
+                        keys used by the game have any effect.
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key in _TRACKED_KEYS:
+                self._held_keys.add(event.key)
+        elif event.type == pygame.KEYUP:
+            self._held_keys.discard(event.key)
+
     def thrust(self) -> float:
         """
         The amount that the keyboard or any connected joysticks are being
@@ -114,6 +274,13 @@ class ControllerInput:
         thrust in 180 degrees from the ship's orientation (i.e. the reverse
         thruster provides negative thrust).
 
+        The keyboard is read as it is now, but the joysticks and game
+        controllers are read as they were at the last call to poll(), which
+        sample() also calls. If neither has been called during the frame, the
+        joystick and game controller values will be out of date, or all zero
+        if they have never been called. Most code should use the thrust from
+        sample() rather than calling this directly.
+
         :return: float - The amount of thrust being indicated by all the input
                             devices combined. Positive thrust is in the
                             direction of the ship's orientation. Negative
@@ -125,28 +292,24 @@ class ControllerInput:
         #
         # First, address the keyboard
         #
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_UP]:
+        if pygame.K_UP in self._held_keys:
             total_thrust += 1.0
-        if keys[pygame.K_DOWN]:
+        if pygame.K_DOWN in self._held_keys:
             total_thrust -= 1.0
 
         #
-        # Now, look at any joysticks.
+        # Now, look at any joysticks, as they were when poll() was last called.
         #
-        for joystick in self._joysticks:
-            guid = joystick.get_guid()
-            if guid in _button_mapping:
-                button_mapping = _button_mapping[guid]
-            else:
-                button_mapping = _button_mapping["default"]
-            total_thrust += joystick.get_axis(button_mapping["thrust"]["axis"]) * button_mapping["thrust"]["invert"]
+        total_thrust += sum(self._thrust_snapshot)
 
         #
         # Finally, clip the resulting total_thrust value so that is in the range [-1.0, 1.0],
         # and then return it/
         #
-        total_thrust = max(-1.0, min(1.0, total_thrust))
+        if total_thrust < -1.0:
+            total_thrust = -1.0
+        elif total_thrust > 1.0:
+            total_thrust = 1.0
 
         return total_thrust
 
@@ -162,10 +325,9 @@ class ControllerInput:
         text_lines = []
 
         # Keyboard
-        keys = pygame.key.get_pressed()
         text_lines.append(f"Keyboard:")
-        text_lines.append(f"  Left Arrow: {keys[pygame.K_LEFT]}")
-        text_lines.append(f"  Right Arrow: {keys[pygame.K_RIGHT]}")
+        text_lines.append(f"  Left Arrow: {pygame.K_LEFT in self._held_keys}")
+        text_lines.append(f"  Right Arrow: {pygame.K_RIGHT in self._held_keys}")
 
         # Joysticks
         for joystick in self._joysticks:
@@ -177,13 +339,61 @@ class ControllerInput:
             for button in range(joystick.get_numbuttons()):
                 text_lines.append(f"  Button {button}: {joystick.get_button(button)}")
 
+        # Game controllers
+        for game_controller in self._game_controllers:
+            text_lines.append(f"Game Controller {game_controller.id}")
+            text_lines.append(f"  Name: {game_controller.name}")
+            text_lines.append(f"  Left Stick Y: {game_controller.get_axis(pygame.CONTROLLER_AXIS_LEFTY)}")
+
         # Draw the text lines
-        font_size = 24
-        font = pygame.font.SysFont(None, font_size)
-        line_position = (10, 10)
+        font_size = _STATE_FONT_SIZE
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, font_size)
+        screen_width, screen_height = screen.get_size()
+        line_bottom_limit = screen_height - font_size - 10
+        x, y = 10, 10
         for text_line in text_lines:
-            text_surface = font.render(text_line, True, (255, 255, 255))
-            screen.blit(text_surface, line_position)
-            line_position = (line_position[0], line_position[1] + font_size)
-            if line_position[1] + font_size + 10 >= screen.get_height():
-                line_position = (screen.get_width() // 2, 10)
+            text_surface = self._render_text(text_line)
+            screen.blit(text_surface, (x, y))
+            y += font_size
+            if y >= line_bottom_limit:
+                x, y = screen_width // 2, 10
+
+    def _render_text(self, text: str) -> pygame.Surface:
+        """
+        Return a surface with the given text rendered on it for
+        show_current_state(), reusing an earlier rendering of the same text
+        when there is one.
+
+        :param text: The line of text to render.
+        :return: pygame.Surface - The rendered text.
+        """
+        text_surface = self._text_cache.get(text)
+        if text_surface is not None:
+            self._text_cache.move_to_end(text)
+            return text_surface
+
+        text_surface = self._font.render(text, True, _STATE_TEXT_COLOR)
+        self._text_cache[text] = text_surface
+        if len(self._text_cache) > _STATE_TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return text_surface
+
+
+#
+# The ControllerInput instance returned by get_controller(). This is intended
+# to be used internally only.
+#
+_controller = None
+
+
+def get_controller() -> ControllerInput:
+    """
+    Return the single ControllerInput instance, creating it on the first call.
+
+    :return: ControllerInput - The game's controller input object.
+    """
+    global _controller
+    if _controller is None:
+        _controller = ControllerInput()
+    return _controller
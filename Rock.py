@@ -1,5 +1,6 @@
 import pygame
 import random
+import typing
 
 from arcade_tools.GameElement import GameElement
 
@@ -8,6 +9,57 @@ _ROCK_IMAGE_FILES = [
     "./images/rock-medium.png",
     "./images/rock-small.png"
 ]
+_NUM_ROCK_IMAGES = len(_ROCK_IMAGE_FILES)
+
+#
+# The rock images, loaded and converted to the display pixel format, in the
+# same order as _ROCK_IMAGE_FILES. The list is filled the first time a Rock is
+# created (see _get_rock_surfaces()) since the display has to exist before the
+# images can be converted. Every Rock then shares these surfaces.
+#
+_rock_surfaces = []
+
+
+def _get_rock_surfaces() -> list[pygame.Surface]:
+    """
+    Return the shared, display-format rock surfaces, loading them on the
+    first call.
+
+    :return: A list of surfaces, one per entry in _ROCK_IMAGE_FILES.
+    """
+    if not _rock_surfaces:
+        for rock_image_file in _ROCK_IMAGE_FILES:
+            _rock_surfaces.append(pygame.image.load(rock_image_file).convert_alpha())
+    return _rock_surfaces
+
+
+#
+# The rock images pre-rotated every _ROCK_ROTATION_STEP_DEGREES degrees
+# counter-clockwise, so that turning a rock is a list lookup instead of a call
+# to pygame.transform.rotate() every frame. _rock_rotations[rock_index] holds
+# the frames for _ROCK_IMAGE_FILES[rock_index], starting with 0 degrees. Like
+# _rock_surfaces, this is filled on first use (see _get_rock_rotations()).
+#
+_ROCK_ROTATION_STEP_DEGREES = 10
+_NUM_ROCK_ROTATIONS = 360 // _ROCK_ROTATION_STEP_DEGREES
+_rock_rotations = []
+
+
+def _get_rock_rotations() -> list[list[pygame.Surface]]:
+    """
+    Return the shared, pre-rotated rock surfaces, building them on the first
+    call.
+
+    :return: One list of _NUM_ROCK_ROTATIONS surfaces per entry in
+                _ROCK_IMAGE_FILES.
+    """
+    if not _rock_rotations:
+        for rock_surface in _get_rock_surfaces():
+            _rock_rotations.append([
+                pygame.transform.rotate(rock_surface, angle).convert_alpha()
+                for angle in range(0, 360, _ROCK_ROTATION_STEP_DEGREES)
+            ])
+    return _rock_rotations
 
 
 class Rock(GameElement):
@@ -32,6 +84,9 @@ class Rock(GameElement):
     medium, or large), and at a random location. Each time it gets hit, it
     breaks into multiple smaller rocks. Once the smallest rock is hit, it is
     removed from the game.
+
+    The rocks are moved together by a RockSwarm rather than one at a time by
+    their own update() methods.
     """
     def __init__(self, rock_center_x: int, rock_center_y: int):
         """
@@ -47,14 +102,61 @@ class Rock(GameElement):
                 f"Please call pygame.init() before using this class."
             )
 
+        # Make sure the display is set up, so that the image can be converted to its pixel format.
+        if pygame.display.get_surface() is None:
+            raise RuntimeError(
+                f"The display must be set up before creating a {self.__class__.__name__} object. "
+                f"Please call pygame.display.set_mode() before using this class."
+            )
+
+        # Pick which of the rock images this rock will use.
+        rock_index = random.randrange(_NUM_ROCK_IMAGES)
+        self._rock_index = rock_index
+
         # Initialize the base GameElement class items.
-        super().__init__(random.choice(_ROCK_IMAGE_FILES))
+        super().__init__(_ROCK_IMAGE_FILES[rock_index])
+
+        # Rocks start off unrotated
+        self._rotation_index = 0
+
+        #
+        # Use the shared copy of the image, which has already been converted
+        # to the display pixel format, so that each new rock does not need
+        # its own converted copy of the pixel data.
+        #
+        self.image = _get_rock_surfaces()[rock_index]
 
         # Reposition the rock so that the center of if it is at the desired position
         self.rect.center = (rock_center_x, rock_center_y)
 
+    def set_angle(self, angle: float):
+        """
+        Turn the rock so that it is drawn rotated counter-clockwise by the
+        given angle. The angle is rounded down to the nearest
+        _ROCK_ROTATION_STEP_DEGREES so that one of the pre-rotated images can
+        be used. The center of the rock stays where it is.
+
+        :param angle: The angle, in degrees, to rotate the rock by.
+        """
+        rotation_index = int(angle // _ROCK_ROTATION_STEP_DEGREES) % _NUM_ROCK_ROTATIONS
+        if rotation_index == self._rotation_index:
+            return
+
+        self._rotation_index = rotation_index
+        center = self.rect.center
+        self.image = _get_rock_rotations()[self._rock_index][rotation_index]
+        self.rect = self.image.get_rect(center=center)
+
+    @typing.override
+    def update(self, *args, **kwargs):
+        """
+        Rocks are moved by the RockSwarm they belong to, in
+        RockSwarm.update_all(), so the GameElement update method is bypassed.
+        """
+        pass
+
     #
-    # GameElement's update(), collide_with() and draw() methods are, currently,
-    # sufficient for the rocks, so it is used as is. These will all
-    # be eventually overridden with custom versions for the ship.
+    # GameElement's collide_with() and draw() methods are, currently,
+    # sufficient for the rocks, so they are used as is. These will all
+    # be eventually overridden with custom versions for the rocks.
     #
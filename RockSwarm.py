@@ -0,0 +1,93 @@
+import numpy as np
+
+from Rock import Rock
+
+
+class RockSwarm:
+    """
+    RockSwarm holds the positions and velocities of all the rocks in the game
+    in NumPy arrays, one row per rock, so that every rock can be moved with a
+    few array operations each frame instead of a Python level update() call
+    per rock.
+
+    Once a Rock has been added to a RockSwarm, the swarm owns its motion.
+    Rock.update() does nothing, and the rock's rect is set by update_all().
+
+    All positions are the centers of the rocks, in pixels, relative to the top
+    left corner of the game screen. All velocities are in pixels per
+    millisecond (ppm). Rocks that move off one edge of the screen wrap around
+    to the opposite edge.
+    """
+    def __init__(self, screen_size: tuple[int, int]):
+        """
+        :param screen_size: The (width, height) of the game screen. This is
+                            used to wrap the rocks around the edges of the
+                            screen.
+        """
+        self._screen_size = np.array(screen_size, dtype=np.float32)
+
+        # The rocks in the swarm. Row i of each array below belongs to rocks[i].
+        self.rocks = []
+
+        # The center of each rock
+        self.pos = np.zeros((0, 2), dtype=np.float32)
+
+        # The velocity of each rock
+        self.vel = np.zeros((0, 2), dtype=np.float32)
+
+        # The radius of each rock, taken as half of the larger side of its rect
+        self.radius = np.zeros(0, dtype=np.float32)
+
+        #
+        # Scratch space, the same shape as pos and vel, that update_all()
+        # works in so that it does not allocate new arrays every frame.
+        #
+        self._step = np.zeros((0, 2), dtype=np.float32)
+
+    def add(self, rock: Rock):
+        """
+        Add a rock to the swarm, starting from its current center and velocity.
+
+        Growing the arrays copies them, but rocks are only added when they are
+        created, not every frame.
+
+        :param rock: The Rock to add.
+        """
+        self.rocks.append(rock)
+        self.pos = np.vstack((self.pos, np.array([rock.rect.center], dtype=np.float32)))
+        self.vel = np.vstack((self.vel, np.array([(rock.velocity.x, rock.velocity.y)], dtype=np.float32)))
+        self.radius = np.append(self.radius, np.float32(max(rock.rect.width, rock.rect.height) / 2))
+        self._step = np.empty_like(self.pos)
+
+    def update_all(self, dt: float):
+        """
+        Move every rock in the swarm for the next frame, wrapping them around
+        the edges of the screen, and then move each rock's rect to match.
+
+        :param dt: The number of milliseconds since the last call to update.
+        """
+        np.multiply(self.vel, dt, out=self._step)
+        np.add(self.pos, self._step, out=self.pos)
+        np.mod(self.pos, self._screen_size, out=self.pos)
+
+        for rock, center in zip(self.rocks, self.pos.astype(np.int32).tolist()):
+            rock.rect.center = center
+
+    def find_collisions(self) -> list[tuple[int, int]]:
+        """
+        Find every pair of rocks in the swarm that are touching, treating
+        each rock as a circle of its radius around its center.
+
+        The distance between every pair of rocks is worked out in one set of
+        array operations, so the only Python level loop is over the pairs
+        that actually touch.
+
+        :return: A list of (i, j) index pairs into self.rocks, with i < j,
+                    one for each pair of touching rocks.
+        """
+        offsets = self.pos[:, None, :] - self.pos[None, :, :]
+        distances_squared = np.einsum('ijk,ijk->ij', offsets, offsets)
+        touching_distances_squared = (self.radius[:, None] + self.radius[None, :]) ** 2
+        np.fill_diagonal(distances_squared, np.inf)
+        i_indexes, j_indexes = np.nonzero(np.triu(distances_squared < touching_distances_squared))
+        return list(zip(i_indexes.tolist(), j_indexes.tolist()))
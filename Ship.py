@@ -1,8 +1,10 @@
+import cmath
+import math
 import pygame
 import typing
 
 from arcade_tools.GameElement import GameElement
-from ControllerInput import ControllerInput
+from ControllerInput import ControllerSnapshot
 
 #
 # The image of the ship is assumed to be positioned such that the front of the
@@ -12,6 +14,70 @@ from ControllerInput import ControllerInput
 _SHIP_IMAGE_FILE = "./images/ship.png"
 _THRUSTER_SPEED_PPM = 0.01
 
+#
+# The ship image, loaded and converted to the display pixel format. This is
+# loaded the first time a Ship is created (see _get_ship_surface()) since the
+# display has to exist before the image can be converted. Every Ship then
+# shares this surface.
+#
+_ship_surface = None
+
+
+def _get_ship_surface() -> pygame.Surface:
+    """
+    Return the shared, display-format ship surface, loading it on the first
+    call.
+
+    :return: pygame.Surface - The ship image.
+    """
+    global _ship_surface
+    if _ship_surface is None:
+        _ship_surface = pygame.image.load(_SHIP_IMAGE_FILE).convert_alpha()
+    return _ship_surface
+
+
+#
+# The ship image pre-rotated clockwise in one degree steps, so that turning
+# the ship is a list lookup instead of a rotation of the image every frame.
+# _ship_rotations[a] is the ship turned a degrees clockwise from pointing
+# straight up. Like _ship_surface, this is filled when the first Ship is
+# created (see _get_ship_rotations()), so that the player's first turn does
+# not stall while the frames are built.
+#
+_NUM_SHIP_ROTATIONS = 360
+_ship_rotations = []
+
+
+def _get_ship_rotations() -> list[pygame.Surface]:
+    """
+    Return the shared, pre-rotated ship surfaces, building them on the first
+    call.
+
+    :return: A list of _NUM_SHIP_ROTATIONS surfaces.
+    """
+    if not _ship_rotations:
+        ship_surface = _get_ship_surface()
+        for angle in range(_NUM_SHIP_ROTATIONS):
+            _ship_rotations.append(pygame.transform.rotozoom(ship_surface, -angle, 1.0).convert_alpha())
+    return _ship_rotations
+
+
+#
+# The ship's orientation is worked out from its heading angle rounded down to
+# a step of 1/_ROTATION_STEPS_PER_DEGREE degrees. The unit complex number
+# pointing in the direction of a given step is kept in _rotation_cache, keyed
+# by the step (modulo one full turn), so that the trig functions only need to
+# be evaluated once for each distinct heading. Since the number of steps in a
+# full turn is fixed, the cache can never hold more than _ROTATION_STEPS
+# entries.
+#
+_ROTATION_STEPS_PER_DEGREE = 2
+_ROTATION_STEPS = 360 * _ROTATION_STEPS_PER_DEGREE
+_rotation_cache: dict[int, complex] = {}
+
+# The heading, in degrees clockwise from the positive x-axis, of a ship pointing straight up
+_STARTING_HEADING = -90.0
+
 
 class Ship(GameElement):
     """
@@ -36,6 +102,11 @@ class Ship(GameElement):
     of the ship is facing. The thrusters always increase the velocity in the
     direction of the orientation vector.
 
+    The orientation is stored as a complex number, with the x component as
+    the real part and the y component as the imaginary part. This keeps the
+    per-frame math in plain Python arithmetic, and rotating the ship by an
+    angle is a single multiplication by cmath.rect(1, angle).
+
     Initially, there is only ever one ship in the game. However, this class
     is written to allow for a multiplayer option in the future.
     """
@@ -54,24 +125,52 @@ class Ship(GameElement):
                 f"Please call pygame.init() before using this class."
             )
 
-        #
-        # Grab a local pointer to the singleton ControllerInput object so that
-        # it does not need to be re-created everytime the update() method is
-        # called.
-        #
-        self._controller_input = ControllerInput()
+        # Make sure the display is set up, so that the image can be converted to its pixel format.
+        if pygame.display.get_surface() is None:
+            raise RuntimeError(
+                f"The display must be set up before creating a {self.__class__.__name__} object. "
+                f"Please call pygame.display.set_mode() before using this class."
+            )
 
         # Initialize the base GameElement class items.
         super().__init__(_SHIP_IMAGE_FILE)
 
+        #
+        # Use the shared copy of the image, which has already been converted
+        # to the display pixel format, keeping the transparency around the
+        # ship, so it does not have to be converted on every draw and each
+        # ship does not need its own copy of the pixel data.
+        #
+        self.image = _get_ship_surface()
+
+        # Build the pre-rotated images now, rather than on the first turn.
+        _get_ship_rotations()
+
         # Reposition the ship so that the center of if it is at the desired position
         self.rect.center = (ship_center_x, ship_center_y)
 
+        #
+        # The fraction of a pixel that the ship has moved but that the rect,
+        # which can only hold whole pixels, has not. Each move adds to these,
+        # and only the whole pixels are moved, so no sub-pixel motion is lost.
+        #
+        self._frac_x = 0.0
+        self._frac_y = 0.0
+
         # Set the starting orientation of the ship to be straight up
-        self.orientation = pygame.math.Vector2(0, -1)
+        self.orientation = -1j
+
+        #
+        # The heading of the ship, in degrees clockwise from the positive
+        # x-axis. Rotations are added up here and the orientation is derived
+        # from the total, rather than multiplying the orientation by each
+        # rotation in turn, so rounding errors do not build up over time.
+        #
+        self._heading = _STARTING_HEADING
+        self._heading_step = int(_STARTING_HEADING * _ROTATION_STEPS_PER_DEGREE) % _ROTATION_STEPS
 
     @typing.override
-    def update(self, dt: int, screen: pygame.Surface = None, **kwargs):
+    def update(self, dt: float, screen: pygame.Surface = None, controller: ControllerSnapshot = None, **kwargs):
         """
         Update the orientation, velocity and location of the ship for the
         next frame.
@@ -99,23 +198,70 @@ class Ship(GameElement):
         :param screen: The screen the ship will be drawn on. This is used to
                         know when the ship goes off the screen This parameter
                         MUST be supplied.
-        :param kwargs: Any other optional key word arguments, such as events,
-                        are ignored by this method.
+        :param controller: The state of the player's controls for this frame,
+                            as from ControllerInput.sample(). This parameter
+                            MUST be supplied.
+        :param kwargs: Any other optional key word arguments, such as events
+                        and screen_size, are ignored by this method.
         """
         # Check that required parameters have been supplied
         if screen is None:
             raise ValueError(f"A screen parameter MUST be supplied to the {self.__class__.__name__}.update() method")
+        if controller is None:
+            raise ValueError(f"A controller parameter MUST be supplied to the {self.__class__.__name__}.update() method")
 
         #
         # Calculate the new velocity based the thruster value
         #
         # Note that the ship goes faster the longer the thruster is applied.
+        # The thruster is usually idle, in which case the velocity does not
+        # change and does not need to be written back.
         #
-        self.velocity += self.orientation * (self._controller_input.thrust() * _THRUSTER_SPEED_PPM)
+        velocity = self.velocity
+        velocity_x, velocity_y = velocity.x, velocity.y
+        thrust = controller.thrust
+        if thrust:
+            thrust_speed = thrust * _THRUSTER_SPEED_PPM
+            orientation = self.orientation
+            velocity_x += orientation.real * thrust_speed
+            velocity_y += orientation.imag * thrust_speed
+            velocity.update(velocity_x, velocity_y)
 
         # Move the ship with the new velocity
-        self.rect.x += self.velocity.x * dt
-        self.rect.y += self.velocity.y * dt
+        frac_x = self._frac_x + velocity_x * dt
+        frac_y = self._frac_y + velocity_y * dt
+        move_x = int(frac_x)
+        move_y = int(frac_y)
+        self._frac_x = frac_x - move_x
+        self._frac_y = frac_y - move_y
+        self.rect.move_ip(move_x, move_y)
+
+    def rotate(self, angle: float):
+        """
+        Rotate the ship by the given angle. The ship's heading keeps the full
+        angle, but its orientation is only updated in steps of
+        1/_ROTATION_STEPS_PER_DEGREE of a degree.
+
+        :param angle: The angle, in degrees, to rotate the ship by. Positive
+                        angles turn the ship clockwise on the screen, since
+                        the screen's y-axis points down.
+        """
+        self._heading = (self._heading + angle) % 360.0
+        heading_step = int(self._heading * _ROTATION_STEPS_PER_DEGREE) % _ROTATION_STEPS
+        if heading_step == self._heading_step:
+            return
+
+        orientation = _rotation_cache.get(heading_step)
+        if orientation is None:
+            orientation = cmath.rect(1.0, math.radians(heading_step / _ROTATION_STEPS_PER_DEGREE))
+            _rotation_cache[heading_step] = orientation
+        self._heading_step = heading_step
+        self.orientation = orientation
+
+        # Turn the image to match, keeping the ship centered where it was.
+        rotation = int(self._heading - _STARTING_HEADING) % _NUM_SHIP_ROTATIONS
+        self.image = _get_ship_rotations()[rotation]
+        self.rect = self.image.get_rect(center=self.rect.center)
 
     #
     # GameElement's collide_with() and draw() methods are, currently,
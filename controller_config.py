@@ -5,6 +5,9 @@ directions or actions that are then returned by the ControllerInput class.
 The key for each entry is the GUID for the controller which should be unique
 for each model and can be read with
 
+Devices that SDL already has a game controller mapping for are read through
+SDL's game controller API instead, and do not use this dictionary.
+
 This dictionary is considered internal to the ControllerInput class code
 and is not intended to be used elsewhere.
 
@@ -12,12 +12,15 @@ pipenv shell
 python main.py
 """
 import argparse
+import collections
 import pygame
 import random
+import time
 
 from Background import Background
-from ControllerInput import ControllerInput
+from ControllerInput import get_controller
 from Rock import Rock
+from RockSwarm import RockSwarm
 from Ship import Ship
 
 #
@@ -38,6 +41,14 @@ pygame.init()
 screen = pygame.display.set_mode((800, 800))
 pygame.display.set_caption("Space Rocks")
 
+#
+# The screen does not change size, so its dimensions are read once here
+# rather than asked for again wherever they are needed.
+#
+screen_size = screen.get_size()
+screen_width, screen_height = screen_size
+screen_rect = screen.get_rect()
+
 #
 # Define desired frame rate in frames per second (fps)
 # Then calculate how many milliseconds per frame (mpf) would correspond to it
@@ -46,30 +57,134 @@ pygame.display.set_caption("Space Rocks")
 fps = 55
 mpf = (1 / fps) * 1000
 
+#
+# Frame pacing
+#
+# pygame.time.Clock.tick() waits using SDL_Delay(), which on many systems is
+# only accurate to around 10ms, more than half of a frame at this frame rate.
+# Instead, wait_for_next_frame() sleeps until shortly before the next frame is
+# due and then busy waits, using the much more accurate time.perf_counter_ns(),
+# for the rest of the time. The sleep is skipped when less than
+# _MIN_SLEEP_NS is left, and otherwise wakes up _SLEEP_SLACK_NS early.
+#
+_FRAME_NS = 1_000_000_000 // fps
+_MIN_SLEEP_NS = 2_000_000
+_SLEEP_SLACK_NS = 1_000_000
+
+
+def wait_for_next_frame(previous_frame_ns: int) -> tuple[float, int]:
+    """
+    Wait until one frame time has passed since the start of the previous
+    frame. Events are pumped while busy waiting so that SDL keeps the input
+    state current.
+
+    :param previous_frame_ns: The time.perf_counter_ns() value at the start
+                                of the previous frame.
+    :return: tuple[float, int] - The number of milliseconds since the start
+                                of the previous frame, and the
+                                time.perf_counter_ns() value at the start of
+                                this frame.
+    """
+    remaining_ns = _FRAME_NS - (time.perf_counter_ns() - previous_frame_ns)
+    if remaining_ns > _MIN_SLEEP_NS:
+        time.sleep((remaining_ns - _SLEEP_SLACK_NS) / 1_000_000_000)
+
+    now_ns = time.perf_counter_ns()
+    while now_ns - previous_frame_ns < _FRAME_NS:
+        pygame.event.pump()
+        now_ns = time.perf_counter_ns()
+
+    return (now_ns - previous_frame_ns) / 1_000_000, now_ns
+
+
+#
+# Only have SDL queue the kinds of events the game handles, so that others,
+# such as mouse motion, are not turned into Python event objects every frame
+# only to be ignored. The keyboard is followed through its KEYDOWN and KEYUP
+# events, while the joystick axes are polled. WINDOWEXPOSED is kept so that
+# the whole screen can be repainted when the window is uncovered or restored,
+# since normally only the areas where elements moved are redrawn. When all
+# events are being shown, nothing is blocked.
+#
+if not args.show_all_events:
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.JOYBUTTONDOWN, pygame.JOYAXISMOTION,
+                              pygame.WINDOWEXPOSED])
+
 #
 # Check for joysticks and controllers
 #
 show_controller_status = False
-controller_input = ControllerInput()
+controller_input = get_controller()
 
 #
 # Set up game elements
 #
-# These will be updated and drawn in the order they appear in the elements list
+# Each frame, every element's update() is called in the order the elements
+# appear in the elements list. They are drawn in a fixed order instead: the
+# background first, then the individually drawn elements in list order, and
+# the rocks last, all together in a single blits() call.
+#
+# Alongside the elements list, the game loop uses a few lists that each hold
+# a subset of the elements, in the same order, so that it does not have to
+# filter the elements every frame:
+#
+#   collidables                 - The elements that take part in collisions.
+#   collidable_rock_indexes     - The indexes in collidables of the rocks.
+#   foreground_elements         - Every element except the background, which
+#                                 is drawn separately first.
+#   individually_drawn_elements - The foreground elements that are drawn with
+#                                 their own draw() call.
+#   rocks                       - The rocks, which are all drawn with a single
+#                                 blits() call.
+#
+# The rocks are also added to rock_swarm, which moves all of them at once.
+#
+# Always use add_element() to add to the game so that all of these lists are
+# kept in sync.
 #
 elements = []
+collidables = []
+collidable_rock_indexes = set()
+foreground_elements = []
+individually_drawn_elements = []
+rocks = []
+rock_swarm = RockSwarm(screen_size)
+
+
+def add_element(element):
+    """
+    Add a game element to the end of the elements list, and to each of the
+    other lists it belongs in.
+
+    :param element: The GameElement to add.
+    """
+    elements.append(element)
+    if element.collidable:
+        if isinstance(element, Rock):
+            collidable_rock_indexes.add(len(collidables))
+        collidables.append(element)
+    if isinstance(element, Background):
+        return
+    foreground_elements.append(element)
+    if isinstance(element, Rock):
+        rocks.append(element)
+        rock_swarm.add(element)
+    else:
+        individually_drawn_elements.append(element)
+
 
 # ------------
 #  Background
 # ------------
 background = Background(screen)
-elements.append(background)
+add_element(background)
 
 # ------
 #  Ship
 # ------
-ship = Ship(screen.get_rect().centerx, screen.get_rect().centery)
-elements.append(ship)
+ship = Ship(screen_rect.centerx, screen_rect.centery)
+add_element(ship)
 
 # -------
 #  Rocks
@@ -77,22 +192,61 @@ elements.append(ship)
 _NUM_STARTING_ROCKS = 10
 
 for index in range(_NUM_STARTING_ROCKS):
-    rock = Rock(rock_center_x=random.randint(0, screen.get_width()),rock_center_y=random.randint(0, screen.get_height()))
-    elements.append(rock)
+    rock = Rock(rock_center_x=random.randint(0, screen_width),rock_center_y=random.randint(0, screen_height))
+    add_element(rock)
 
 #
 # Run the game loop
 #
-clock = pygame.time.Clock()
 game_over = False
 quit_game = False
-while not quit_game:
-    dt = clock.tick(fps)
 
-    # Clear the screen
-    screen.fill((0, 0, 0))
+#
+# The areas of the screen that the elements other than the background were
+# drawn over in the last frame. Only these need to have the background
+# redrawn over them. None means the whole background needs to be drawn, as
+# it does on the first frame.
+#
+previous_rects = None
+
+#
+# The grid used as a broad phase for collision detection. The screen is split
+# into square cells, _COLLISION_CELL_SIZE pixels on a side (about the size of
+# the largest rock), and each cell lists the indexes of the collidable
+# elements whose rects overlap it. Only elements that share a cell can
+# possibly be touching, so each element only has to be tested against those.
+# The same dictionary is cleared and refilled each frame.
+#
+# Collisions between two rocks are not looked for with the grid. rock_swarm
+# finds those for all the rocks at once.
+#
+_COLLISION_CELL_SIZE = 64
+collision_grid = collections.defaultdict(list)
+
+#
+# Look up the pygame functions called every frame once, rather than going
+# through the pygame module attributes each time around the loop.
+#
+event_get = pygame.event.get
+display_update = pygame.display.update
+
+#
+# Each frame waits first, and then reads the input, updates, checks for
+# collisions, draws, and updates the display, in that order. Keeping the wait
+# at the top, directly before the input is read, means the input used for each
+# frame is sampled as late as possible and goes straight through to the
+# display without waiting out another frame time. The frame wait should not be
+# moved between reading the input and using it.
+#
+frame_ns = time.perf_counter_ns()
+while not quit_game:
+    #
+    # Wait for the next frame. This always waits for a full frame time, so
+    # there is never a frame where no time has passed.
+    #
+    dt, frame_ns = wait_for_next_frame(frame_ns)
 
-    all_events = pygame.event.get()
+    all_events = event_get()
 
     # Handle game level events
     for event in all_events:
@@ -102,28 +256,80 @@ while not quit_game:
             quit_game = True
         if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
             show_controller_status = not show_controller_status
+        if event.type == pygame.WINDOWEXPOSED:
+            # The window contents may have been lost, so repaint all of it this frame
+            previous_rects = None
+        controller_input.handle_event(event)
+
+    # Read the controls once for this frame
+    controller_snapshot = controller_input.sample()
 
     # Update the elements, including element level events
     for element in elements:
-        element.update(dt=dt, events=all_events, screen=screen)
+        element.update(dt=dt, events=all_events, screen=screen, screen_size=screen_size, controller=controller_snapshot)
+    rock_swarm.update_all(dt)
 
     # Check for and handle collisions between objects
-    for element in [e for e in elements if e.collidable]:
-        other_elements = [e for e in elements if e is not element and e.collidable]
-        elements_collided_with_indexes = element.rect.collidelistall(other_elements)
-        for element_collided_with_index in elements_collided_with_indexes:
-            element.collided_with(other_elements[element_collided_with_index])
+    collidable_rects = [e.rect for e in collidables]
+    collidable_cells = []
+    collision_grid.clear()
+    for element_index, rect in enumerate(collidable_rects):
+        cells = [
+            (cell_x, cell_y)
+            for cell_x in range(rect.left // _COLLISION_CELL_SIZE, (rect.right - 1) // _COLLISION_CELL_SIZE + 1)
+            for cell_y in range(rect.top // _COLLISION_CELL_SIZE, (rect.bottom - 1) // _COLLISION_CELL_SIZE + 1)
+        ]
+        collidable_cells.append(cells)
+        for cell in cells:
+            collision_grid[cell].append(element_index)
 
-    # Draw the elements
-    for element in elements:
+    for element_index, element in enumerate(collidables):
+        candidate_indexes = set()
+        for cell in collidable_cells[element_index]:
+            candidate_indexes.update(collision_grid[cell])
+        candidate_indexes.discard(element_index)
+        if element_index in collidable_rock_indexes:
+            candidate_indexes -= collidable_rock_indexes
+        if not candidate_indexes:
+            continue
+
+        candidate_indexes = sorted(candidate_indexes)
+        candidate_rects = [collidable_rects[i] for i in candidate_indexes]
+        for candidate_index in element.rect.collidelistall(candidate_rects):
+            element.collided_with(collidables[candidate_indexes[candidate_index]])
+
+    for rock_index, other_rock_index in rock_swarm.find_collisions():
+        rock = rock_swarm.rocks[rock_index]
+        other_rock = rock_swarm.rocks[other_rock_index]
+        rock.collided_with(other_rock)
+        other_rock.collided_with(rock)
+
+    # Draw the elements, starting with the parts of the background that need it
+    background.draw(screen, dirty_rects=previous_rects)
+    for element in individually_drawn_elements:
         element.draw(screen)
+    screen.blits([(rock.image, rock.rect) for rock in rocks], doreturn=False)
+    current_rects = [element.rect.copy() for element in foreground_elements]
 
     # Draw any debug elements
     if show_controller_status:
         controller_input.show_current_state(screen)
 
+    #
     # Update the display to pick up what was drawn above for this frame
-    pygame.display.update()
+    #
+    # When only parts of the background were redrawn, the only areas of the
+    # screen that changed are where the elements were last frame and where
+    # they are now, so only those are sent to the display. Otherwise, the
+    # whole display is updated.
+    #
+    if previous_rects is None or show_controller_status:
+        display_update()
+    else:
+        display_update(previous_rects + current_rects)
+
+    # The debug text is not tracked, so redraw the whole background next frame if it was shown
+    previous_rects = None if show_controller_status else current_rects
 
 #
 # Quick the game and exit out of the program